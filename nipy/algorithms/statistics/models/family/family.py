@@ -58,6 +58,28 @@ class Family(object):
 
         return 1. / (self.link.deriv(mu)**2 * self.variance(mu))
 
+    def weights_deriv_mu(self, mu):
+
+        """
+        Weights, link derivative and variance for IRLS step.
+
+        Evaluates link'(mu) and variance(mu) once, and derives the
+        weights from them.
+
+        INPUTS:
+           mu  -- mean parameter in exponential family
+
+        OUTPUTS: w, d, v
+           w   -- weights used in WLS step of GLM/GAM fit
+           d   -- link'(mu)
+           v   -- variance(mu)
+
+        """
+
+        d = self.link.deriv(mu)
+        v = self.variance(mu)
+        return 1. / (d**2 * v), d, v
+
     def deviance(self, Y, mu, scale=1.):
         """
         Deviance of (Y,mu) pair. Deviance is usually defined
@@ -77,6 +99,25 @@ class Family(object):
 
         return np.power(self.devresid(Y, mu), 2).sum() / scale
 
+    def deviance_and_pearson(self, Y, mu, variance):
+        """
+        Deviance and Pearson's X^2 statistic of (Y,mu) pair.
+
+        INPUTS:
+           Y        -- response variable
+           mu       -- mean parameter
+           variance -- variance(mu)
+
+        OUTPUTS: dev, pearson
+           dev      -- deviance, as for `deviance` with scale 1
+           pearson  -- SUM_i (Y_i - mu_i)**2 / variance_i
+
+        """
+
+        resid = Y - mu
+        pearson = (resid * resid / variance).sum()
+        return self.deviance(Y, mu), pearson
+
     def devresid(self, Y, mu):
         """
         The deviance residuals, defined as the residuals
@@ -156,6 +197,28 @@ class Poisson(Family):
         """
         return np.sign(Y - mu) * np.sqrt(2 * Y * np.log(Y / mu) - 2 * (Y - mu))
 
+    def deviance_and_pearson(self, Y, mu, variance):
+        """
+        Poisson deviance and Pearson's X^2 statistic
+
+        Both sums share the residuals Y - mu, and the deviance is summed
+        directly rather than squaring the deviance residuals.
+
+        INPUTS:
+           Y        -- response variable
+           mu       -- mean parameter
+           variance -- variance(mu)
+
+        OUTPUTS: dev, pearson
+           dev      -- deviance, as for `deviance` with scale 1
+           pearson  -- SUM_i (Y_i - mu_i)**2 / variance_i
+
+        """
+        resid = Y - mu
+        pearson = (resid * resid / variance).sum()
+        dev = 2 * (Y * np.log(Y / mu) - resid).sum()
+        return dev, pearson
+
 class Gaussian(Family):
 
     """
@@ -188,6 +251,27 @@ class Gaussian(Family):
 
         return (Y - mu) / np.sqrt(self.variance(mu) * scale)
 
+    def deviance_and_pearson(self, Y, mu, variance):
+        """
+        Gaussian deviance and Pearson's X^2 statistic
+
+        With scale 1, the Gaussian deviance is Pearson's X^2, so one sum
+        gives both.
+
+        INPUTS:
+           Y        -- response variable
+           mu       -- mean parameter
+           variance -- variance(mu)
+
+        OUTPUTS: dev, pearson
+           dev      -- deviance, as for `deviance` with scale 1
+           pearson  -- SUM_i (Y_i - mu_i)**2 / variance_i
+
+        """
+        resid = Y - mu
+        pearson = (resid * resid / variance).sum()
+        return pearson, pearson
+
 class Gamma(Family):
 
     """
@@ -227,6 +311,28 @@ class Binomial(Family):
         self.variance = V.Binomial(n=self.n)
         self.link = link
 
+    def weights_deriv_mu(self, mu):
+        """
+        Weights, link derivative and variance for IRLS step.
+
+        For the canonical logit link with one trial, all three terms
+        follow from p * (1 - p).
+
+        INPUTS:
+           mu  -- mean parameter
+
+        OUTPUTS: w, d, v
+           w   -- weights used in WLS step of GLM/GAM fit
+           d   -- link'(mu)
+           v   -- variance(mu)
+
+        """
+        if self.link is not L.logit or self.n != 1:
+            return super(Binomial, self).weights_deriv_mu(mu)
+        p = self.link.clean(mu)
+        v = p * (1 - p)
+        return v, 1. / v, v
+
     def devresid(self, Y, mu):
         """
         Binomial deviance residual
@@ -10,6 +10,7 @@ from __future__ import absolute_import
 from six import Iterator
 
 import numpy as np
+import numpy.linalg as npl
 
 from . import family
 from .regression import WLSModel
@@ -21,6 +22,12 @@ class Model(WLSModel, Iterator):
 
     def __init__(self, design, family=family.Gaussian()):
         self.family = family
+        self._irls_cache = None
+        # Deviance of the results last given a scale estimate
+        self._dev_cache = None
+        # Work arrays for IRLS steps, reused across iterations and fits
+        self._resid_buf = self._sw_buf = None
+        self._wdesign_buf = self._wz_buf = None
         super(Model, self).__init__(design, weights=1)
 
     def __iter__(self):
@@ -41,19 +48,70 @@ class Model(WLSModel, Iterator):
             Y = self.Y
         return self.family.deviance(Y, results.mu) / scale
 
-    def __next__(self):
-        results = self.results
-        Y = self.Y
-        self.weights = self.family.weights(results.mu)
+    def _irls_terms(self, mu):
+        """
+        Residuals, IRLS weights, link derivative and variance at `mu`.
+
+        The terms for the last `mu` are cached, so that estimating the scale
+        and taking the next IRLS step from the same `mu` share one
+        evaluation.
+        """
+        cache = self._irls_cache
+        if cache is None or cache[0] is not mu:
+            weights, deriv, variance = self.family.weights_deriv_mu(mu)
+            resid = np.subtract(self.Y, mu, out=self._resid_buf)
+            cache = (mu, resid, weights, deriv, variance)
+            self._irls_cache = cache
+        return cache[1:]
+
+    def _wls_minimal_fit(self, Z):
+        """
+        Weighted least squares fit of working response `Z`.
+
+        Uses the current weights.  Unlike ``WLSModel.fit``, this does not
+        recompute the pseudoinverse, rank and covariance of the design, and
+        only returns the estimates needed for the next IRLS step.
+        """
+        sw = np.sqrt(self.weights, out=self._sw_buf)
+        wdesign = np.multiply(self.design, sw[:, None], out=self._wdesign_buf)
+        wZ = np.multiply(Z, sw, out=self._wz_buf)
+        beta = npl.lstsq(wdesign, wZ, rcond=None)[0]
+        return IRLSResults(beta, np.dot(self.design, beta), Z, self.weights,
+                           self.df_resid)
+
+    def _wls_full_fit(self, results):
+        """
+        Full WLS results for the working response of IRLS step `results`.
+        """
+        self.weights = results.weights
         self.initialize(self.design)
-        Z = results.predicted + self.family.link.deriv(results.mu) *\
-            (Y - results.mu)
-        newresults = super(Model, self).fit(Z)
-        newresults.Y = Y
-        newresults.mu = self.family.link.inverse(newresults.predicted)
-        self.iter += 1
+        newresults = super(Model, self).fit(results.Z)
+        newresults.Y = results.Y
+        newresults.mu = results.mu
+        newresults.scale = results.scale
         return newresults
 
+    def _irls_step(self, predicted, mu):
+        """
+        One IRLS step from linear predictor `predicted` and mean `mu`.
+
+        Sets ``self.beta`` to the updated coefficients.
+        """
+        resid, self.weights, deriv, _ = self._irls_terms(mu)
+        # Z is kept in the results, so gets its own array
+        Z = deriv * resid
+        Z += predicted
+        results = self._wls_minimal_fit(Z)
+        results.Y = self.Y
+        results.mu = self.family.link.inverse(results.predicted)
+        self.beta = results.theta
+        return results
+
+    def __next__(self):
+        results = self._irls_step(self.results.predicted, self.results.mu)
+        self.iter += 1
+        return results
+
     def cont(self, tol=1.0e-05):
         """
         Continue iterating, or has convergence been obtained?
@@ -61,7 +119,11 @@ class Model(WLSModel, Iterator):
         if self.iter >= Model.niter:
             return False
 
-        curdev = self.deviance(results=self.results)
+        cache = self._dev_cache
+        if cache is not None and cache[0] is self.results:
+            curdev = cache[1]
+        else:
+            curdev = self.deviance(results=self.results)
 
         if np.fabs((self.dev - curdev) / curdev) < tol:
             return False
@@ -77,21 +139,151 @@ class Model(WLSModel, Iterator):
         if results is None:
             results = self.results
         if Y is None:
-            Y = self.Y
-        resid = Y - results.mu
-        return ((np.power(resid, 2) / self.family.variance(results.mu)).sum()
-                / results.df_resid)
+            resid, _, _, variance = self._irls_terms(results.mu)
+        else:
+            resid = Y - results.mu
+            variance = self.family.variance(results.mu)
+        return (resid * resid / variance).sum() / results.df_resid
 
-    def fit(self, Y):
+    def _update_scale(self):
+        """
+        Set the scale of the current results to Pearson\'s X^2 estimate.
+
+        The deviance comes out of the same pass over the results, and is
+        kept for the next convergence check in `cont`.
+        """
+        results = self.results
+        _, _, _, variance = self._irls_terms(results.mu)
+        dev, pearson = self.family.deviance_and_pearson(self.Y, results.mu,
+                                                        variance)
+        self._dev_cache = (results, dev)
+        self.scale = results.scale = pearson / results.df_resid
+
+    def _initial_fit(self, Y):
+        """
+        Set up IRLS for response `Y`, starting from ``link.initialize(Y)``.
+        """
         self.Y = np.asarray(Y, np.float64)
+        self._irls_cache = self._dev_cache = None
+        if (self._resid_buf is None or
+            self._resid_buf.shape != self.Y.shape):
+            self._resid_buf = np.empty_like(self.Y)
+            self._sw_buf = np.empty_like(self.Y)
+            self._wz_buf = np.empty_like(self.Y)
+            self._wdesign_buf = np.empty(self.design.shape, np.float64)
         iter(self)
         self.results = super(Model, self).fit(
             self.family.link.initialize(Y))
         self.results.mu = self.family.link.inverse(self.results.predicted)
-        self.scale = self.results.scale = self.estimate_scale()
+        self.beta = self.results.theta
+        self._update_scale()
+
+    def fit(self, Y):
+        self._initial_fit(Y)
 
         while self.cont():
             self.results = next(self)
-            self.scale = self.results.scale = self.estimate_scale()
+            self._update_scale()
 
+        if self.iter > 0:
+            self.results = self._wls_full_fit(self.results)
         return self.results
+
+    def fit_squarem(self, Y, tol=1.0e-05):
+        """
+        Fit model to data `Y` with SQUAREM-accelerated IRLS.
+
+        Each iteration takes two IRLS steps from the current coefficients,
+        extrapolates along them (scheme S3 of Varadhan & Roland), and takes
+        one more IRLS step from the extrapolated coefficients.  If that
+        step fails or increases the deviance, the second plain IRLS step is
+        kept instead.  Iteration stops early if the plain IRLS steps
+        fail, as they can when IRLS diverges on separable data.
+
+        IRLS is Newton's method for canonical links, and usually converges
+        in a few steps, so plain `fit` is then cheaper.  The acceleration
+        pays off where IRLS converges slowly.
+
+        Parameters
+        ----------
+        Y : array-like
+            The response.
+        tol : float, optional
+            Convergence tolerance on the relative change in deviance, as for
+            `cont`.
+
+        Returns
+        -------
+        fit : RegressionResults
+
+        References
+        ----------
+        R. Varadhan and C. Roland. "Simple and globally convergent methods for
+        accelerating the convergence of any EM algorithm." Scandinavian
+        Journal of Statistics, 35(2):335-353, 2008.
+        """
+        self._initial_fit(Y)
+
+        while self.cont(tol):
+            results = self.results
+            try:
+                results1 = self._irls_step(results.predicted, results.mu)
+                results2 = self._irls_step(results1.predicted, results1.mu)
+            except npl.LinAlgError:
+                results2 = None
+            if results2 is None or not (np.all(np.isfinite(results1.mu)) and
+                                        np.all(np.isfinite(results2.mu))):
+                # IRLS itself diverges (e.g. for separable data), until the
+                # weights or the inverse link overflow; keep the last finite
+                # estimates
+                self.beta = results.theta
+                break
+            r = results1.theta - results.theta
+            v = results2.theta - results1.theta - r
+            vv = np.dot(v, v)
+            newresults = results2
+            if vv > 0:
+                alpha = min(-np.sqrt(np.dot(r, r) / vv), -1.)
+                beta = results.theta - 2 * alpha * r + alpha ** 2 * v
+                predicted = np.dot(self.design, beta)
+                with np.errstate(over='ignore', invalid='ignore'):
+                    mu = self.family.link.inverse(predicted)
+                extrapolated = None
+                # the extrapolation can overshoot far enough for the inverse
+                # link to overflow, or for the stabilizing step to fail
+                if np.all(np.isfinite(predicted)) and np.all(np.isfinite(mu)):
+                    try:
+                        extrapolated = self._irls_step(predicted, mu)
+                    except npl.LinAlgError:
+                        pass
+                if extrapolated is not None:
+                    # a non-finite deviance rejects the extrapolated step too
+                    dev_ext = self.deviance(results=extrapolated)
+                    if (np.all(np.isfinite(extrapolated.theta)) and
+                        np.isfinite(dev_ext) and
+                        dev_ext <= self.deviance(results=results2)):
+                        newresults = extrapolated
+            self.iter += 1
+            self.results = newresults
+            self.beta = newresults.theta
+            self._update_scale()
+
+        if self.iter > 0:
+            self.results = self._wls_full_fit(self.results)
+        return self.results
+
+
+class IRLSResults(object):
+    """
+    Minimal results from one IRLS step of a GLM fit.
+
+    Holds the estimates that the next step needs; ``Model.fit`` returns
+    full ``RegressionResults`` for the last step.
+    """
+
+    def __init__(self, theta, predicted, Z, weights, df_resid):
+        self.theta = theta
+        self.predicted = predicted
+        self.Z = Z
+        self.weights = weights
+        self.df_resid = df_resid
@@ -8,9 +8,11 @@ from __future__ import absolute_import
 import numpy as np
 
 from .. import family
-from ..glm import Model as GLM
+from ..glm import Model as GLM, IRLSResults
+from ..regression import RegressionResults
 
 from nose.tools import assert_equal, assert_true, assert_false
+from numpy.testing import assert_almost_equal, assert_array_almost_equal
 
 VARS = {}
 
@@ -39,6 +41,59 @@ def test_cont():
     assert_false(cmodel.cont(np.inf))
 
 
+def test_irls_steps():
+    # IRLS steps return minimal results; the fit returns full results
+    X = VARS['X']
+    Y = VARS['Y']
+    cmodel = GLM(design=X, family=family.Binomial())
+    results = cmodel.fit(Y)
+    assert_true(isinstance(results, RegressionResults))
+    assert_array_almost_equal(cmodel.family.link.inverse(results.predicted),
+                              results.mu)
+    step = next(cmodel)
+    assert_true(isinstance(step, IRLSResults))
+    assert_array_almost_equal(step.theta, results.theta)
+
+
+def test_refit():
+    # Refitting a model, with its reused work arrays, matches fresh fits
+    X = VARS['X']
+    Y = VARS['Y']
+    Y2 = Y[::-1]
+    cmodel = GLM(design=X, family=family.Binomial())
+    cmodel.fit(Y)
+    results2 = cmodel.fit(Y2)
+    fresh2 = GLM(design=X, family=family.Binomial()).fit(Y2)
+    assert_array_almost_equal(results2.theta, fresh2.theta)
+    assert_array_almost_equal(results2.mu, fresh2.mu)
+
+
+def test_fit_squarem():
+    # Accelerated fit converges to the same estimates
+    X = VARS['X']
+    Y = VARS['Y']
+    for fam in (family.Binomial(), family.Gaussian()):
+        results = GLM(design=X, family=fam).fit(Y)
+        cmodel = GLM(design=X, family=fam)
+        sq_results = cmodel.fit_squarem(Y, tol=1e-10)
+        assert_true(isinstance(sq_results, RegressionResults))
+        assert_array_almost_equal(sq_results.theta, results.theta, 4)
+        assert_array_almost_equal(cmodel.beta, results.theta, 4)
+        assert_equal(sq_results.df_resid, 30)
+
+
+def test_fit_squarem_separable():
+    # IRLS diverges on (nearly) separable data; the fit stays finite
+    for seed in range(10):
+        rng = np.random.RandomState(seed)
+        X = rng.standard_normal((40, 3))
+        X[:, 0] *= 30
+        Y = (X[:, 0] > 0).astype(float)
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            results = GLM(design=X, family=family.Binomial()).fit_squarem(Y)
+        assert_true(np.all(np.isfinite(results.theta)))
+
+
 def test_Logisticdegenerate():
     X = VARS['X'].copy()
     X[:,0] = X[:,1] + X[:,2]
@@ -46,3 +101,26 @@ def test_Logisticdegenerate():
     cmodel = GLM(design=X, family=family.Binomial())
     results = cmodel.fit(Y)
     assert_equal(results.df_resid, 31)
+
+
+def test_weights_deriv_mu():
+    # Fused IRLS terms agree with the separate family methods
+    mu = np.linspace(0.05, 0.95, 10)
+    for fam in (family.Binomial(), family.Binomial(link=family.family.L.probit),
+                family.Poisson(), family.Gaussian(), family.Gamma()):
+        w, d, v = fam.weights_deriv_mu(mu)
+        assert_array_almost_equal(w, fam.weights(mu))
+        assert_array_almost_equal(d, fam.link.deriv(mu))
+        assert_array_almost_equal(v, fam.variance(mu))
+
+
+def test_deviance_and_pearson():
+    # Fused sums agree with the deviance and Pearson's X^2
+    mu = np.linspace(0.05, 0.95, 10)
+    Y = np.linspace(0.1, 0.9, 10)
+    for fam in (family.Binomial(), family.Poisson(), family.Gaussian(),
+                family.Gamma()):
+        v = fam.variance(mu)
+        dev, pearson = fam.deviance_and_pearson(Y, mu, v)
+        assert_almost_equal(dev, fam.deviance(Y, mu))
+        assert_almost_equal(pearson, ((Y - mu) ** 2 / v).sum())
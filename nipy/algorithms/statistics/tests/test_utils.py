@@ -7,7 +7,10 @@ import scipy.linalg as spl
 
 
 from ..utils import (multiple_mahalanobis, z_score, multiple_fast_inv,
-                     check_cast_bin8)
+                     check_cast_bin8, complex, cube_with_strides_center,
+                     join_complexes, decompose2d, decompose3d,
+                     decompose2d_array, decompose3d_array, test_EC2,
+                     test_EC3)
 from nose.tools import assert_true, assert_equal, assert_raises
 from numpy.testing import (assert_almost_equal, assert_array_almost_equal,
                            assert_array_equal)
@@ -40,6 +43,31 @@ def test_mahalanobis2():
     assert_almost_equal(mah, f_mah)
 
 
+def test_mahalanobis_small():
+    # Closed-form path for few features agrees with explicit inverses
+    rng = np.random.RandomState(42)
+    for n_features in (1, 2, 3, 4):
+        x = rng.randn(n_features, 20)
+        A = rng.randn(n_features, n_features + 2, 20)
+        Aa = np.einsum('ijs,kjs->iks', A, A)
+        # non-symmetric matrices give the same quadratic form
+        Aa[..., 0] += np.triu(np.ones((n_features, n_features)), 1)
+        mah = [np.dot(x[:, i], np.dot(np.linalg.inv(Aa[:, :, i]), x[:, i]))
+               for i in range(20)]
+        Aa_copy = Aa.copy()
+        assert_array_almost_equal(multiple_mahalanobis(x, Aa), mah)
+        # Input covariances are left alone
+        assert_array_equal(Aa, Aa_copy)
+        Aa[..., 3] = 0
+        assert_raises(np.linalg.LinAlgError, multiple_mahalanobis, x, Aa)
+        Aa[..., 3] = np.nan
+        assert_raises(ValueError, multiple_mahalanobis, x, Aa)
+        if n_features <= 3:  # LAPACK may reject NaNs for larger matrices
+            mah = multiple_mahalanobis(x, Aa, check_finite=False)
+            assert_true(np.isnan(mah[3]))
+            assert_true(np.all(np.isfinite(np.delete(mah, 3))))
+
+
 def test_multiple_fast_inv():
     shape = (10, 20, 20)
     X = np.random.randn(*shape)
@@ -49,6 +77,90 @@ def test_multiple_fast_inv():
         X_inv_ref[i] = spl.inv(X[i])
     X_inv = multiple_fast_inv(X)
     assert_array_almost_equal(X_inv_ref, X_inv)
+    # Inversion happens in place
+    assert_true(X_inv is X)
+    # Non-finite input raises
+    X = np.random.randn(*shape)
+    X[3, 2, 1] = np.nan
+    assert_raises(ValueError, multiple_fast_inv, X)
+    # Singular matrices raise
+    assert_raises(np.linalg.LinAlgError, multiple_fast_inv,
+                  np.zeros(shape))
+    # Closed-form inverses of small matrices
+    rng = np.random.RandomState(42)
+    for M in (1, 2, 3):
+        X = rng.randn(10, M, M + 2)
+        X = np.einsum('sij,skj->sik', X, X)
+        X[0] += np.triu(np.ones((M, M)), 1)
+        X_inv_ref = np.linalg.inv(X)
+        X_inv = multiple_fast_inv(X)
+        assert_true(X_inv is X)
+        assert_array_almost_equal(X_inv, X_inv_ref)
+        X[4] = 0
+        assert_raises(np.linalg.LinAlgError, multiple_fast_inv, X)
+
+
+def test_complex():
+    faces = complex([(2, 0, 1)])
+    assert_equal(faces, {1: set([(0,), (1,), (2,)]),
+                         2: set([(0, 1), (0, 2), (1, 2)]),
+                         3: set([(0, 1, 2)])})
+    # Default triangulation of cube into 6 tetrahedra
+    faces = complex()
+    assert_equal([len(faces[k]) for k in range(1, 5)], [8, 19, 18, 6])
+
+
+def test_cube_with_strides_center():
+    c = cube_with_strides_center((0, 0), (3, 1))
+    assert_equal(c, {1: set([(0,), (1,), (3,), (4,)]),
+                     2: set([(0, 1), (0, 3), (0, 4), (1, 4), (3, 4)]),
+                     3: set([(0, 1, 4), (0, 3, 4)])})
+    # Results are cached; array inputs give the same answer, and changing
+    # the returned dictionary does not change later results
+    c[3] = set()
+    assert_equal(cube_with_strides_center(np.array([0, 0]),
+                                          np.array([3, 1]))[3],
+                 set([(0, 1, 4), (0, 3, 4)]))
+    assert_raises(ValueError, cube_with_strides_center, (0, 0), (3,))
+    # Vertices are strided in one dimension too
+    assert_equal(cube_with_strides_center((1,), (3,)),
+                 {1: set([(3,), (6,)]), 2: set([(3, 6)])})
+
+
+def test_join_complexes():
+    faces = join_complexes(complex([(0, 1, 2)]), complex([(1, 3)]))
+    assert_equal(faces, {1: set([(0,), (1,), (2,), (3,)]),
+                         2: set([(0, 1), (0, 2), (1, 2), (1, 3)]),
+                         3: set([(0, 1, 2)])})
+
+
+def test_decompose():
+    # A single cube decomposes into the default triangulation
+    tetrahedra = set(tuple(t) for t in decompose3d((2, 2, 2), dim=4))
+    assert_equal(tetrahedra, complex()[4])
+    assert_equal(list(decompose3d((2, 2, 2), dim=1)), list(range(8)))
+    assert_equal(list(decompose2d((2, 2), dim=3)), [[0, 1, 3], [0, 2, 3]])
+    # Simplex counts, and Euler characteristic of a box
+    assert_equal(test_EC3((3, 4, 5)), (144, 340, 255, 60, 1))
+    assert_equal(test_EC2((3, 4)), (12, 23, 12, 1))
+    for shape in ((1, 4, 3), (5, 2, 2)):
+        assert_equal(test_EC3(shape)[-1], 1)
+    # Arrays of simplices agree with the generators
+    for shape in ((3, 4, 5), (1, 4, 3)):
+        for dim in range(1, 6):
+            arr = decompose3d_array(shape, dim)
+            assert_equal(arr.shape[1], dim)
+            if 1 <= dim <= 4:
+                assert_equal(arr.shape[0], test_EC3(shape)[4 - dim])
+            assert_equal(arr.reshape(-1).tolist(),
+                         list(np.ravel(list(decompose3d(shape, dim)))))
+    for dim in range(1, 5):
+        arr = decompose2d_array((3, 4), dim)
+        assert_equal(arr.shape[1], dim)
+        if 1 <= dim <= 3:
+            assert_equal(arr.shape[0], test_EC2((3, 4))[3 - dim])
+        assert_equal(arr.reshape(-1).tolist(),
+                     list(np.ravel(list(decompose2d((3, 4), dim)))))
 
 
 def assert_equal_bin8(actual, expected):
@@ -74,3 +186,8 @@ def test_check_cast_bin8():
                       np.array([0, 0.1, 1], dtype=in_dtype))
         assert_raises(ValueError, check_cast_bin8,
                       np.array([0, -1, 1], dtype=in_dtype))
+    assert_raises(ValueError, check_cast_bin8, np.array([0, np.nan, 1]))
+    assert_equal_bin8(np.array([[False, True], [True, True]]),
+                      [[0, 1], [1, 1]])
+    assert_equal_bin8(np.array([[False, True], [True, False]])[:, ::-1],
+                      [[1, 0], [0, 1]])
@@ -1,12 +1,16 @@
 from __future__ import absolute_import
 # emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
 # vi: set ft=python sts=4 ts=4 sw=4 et:
-from itertools import combinations
+from functools import reduce
+from itertools import chain, combinations, product
+from operator import mul
 
 import numpy as np
 
 from scipy.stats import norm
 
+from nipy.utils.arrays import strides_from
+
 TINY = 1e-16
 
 
@@ -18,13 +22,17 @@ def z_score(pvalue):
     return z
 
 
-def multiple_fast_inv(a):
+def multiple_fast_inv(a, check_finite=True):
     """ Compute the inverse of a set of arrays in-place
 
     Parameters
     ----------
     a: array_like of shape (n_samples, M, M)
         Set of square matrices to be inverted. `a` is changed in place.
+    check_finite : bool, optional
+        Whether to check that `a` contains only finite numbers.  Disabling
+        the check saves a pass over `a`, but may result in problems (crashes,
+        non-termination) if the inputs do contain infinities or NaNs.
 
     Returns
     -------
@@ -42,51 +50,68 @@ def multiple_fast_inv(a):
 
     Notes
     -----
-    This function is copied from scipy.linalg.inv, but with some customizations
-    for speed-up from operating on multiple arrays.  It also has some
-    conditionals to work with different scipy versions.
+    Matrices with ``M <= 3`` are inverted in closed form, vectorized over
+    samples.  Larger matrices are delegated to ``np.linalg.inv``, which
+    inverts the whole stack of matrices in a single call, rather than looping
+    over the matrices in Python.
     """
-    # Consider errors for sparse, masked, object arrays, as for
-    # _asarray_validated?
-    from scipy.linalg.lapack import get_lapack_funcs
     S, M, N = a.shape
     if M != N:
         raise ValueError('a must have shape(n_samples, M, M)')
-    a = np.asarray_chkfinite(a)
-    getrf, getri = get_lapack_funcs(('getrf','getri'), (a[0],))
-    # Calculate lwork on different scipy versions
-    try:
-        getri_lwork, = get_lapack_funcs(('getri_lwork',), (a[0],))
-    except (ValueError, AttributeError):  # scipy < 0.15
-        # scipy 0.10, 0.11 -> AttributeError
-        # scipy 0.12, 0.13, 0.14 -> ValueError
-        from scipy.linalg import calc_lwork
-        lwork = calc_lwork.getri(getri.prefix, M)[1]
-    else:  # scipies >= 0.15 have getri_lwork function
-        lwork, info = getri_lwork(M)
-        if info != 0:
-            raise ValueError('internal getri work space query failed: %d' % (info,))
-        lwork = int(lwork.real)
-    # XXX: the following line fixes curious SEGFAULT when
-    # benchmarking 500x500 matrix inverse. This seems to
-    # be a bug in LAPACK ?getri routine because if lwork is
-    # minimal (when using lwork[0] instead of lwork[1]) then
-    # all tests pass. Further investigation is required if
-    # more such SEGFAULTs occur.
-    lwork = int(1.01 * lwork)
-    for i, ai in enumerate(a):
-        lu, piv, info = getrf(ai, overwrite_a=True)
-        if info == 0:
-            a[i], info = getri(lu, piv, lwork=lwork, overwrite_lu=1)
-        if info > 0:
-            raise np.linalg.LinAlgError("singular matrix")
-        if info < 0:
-            raise ValueError('illegal value in %d-th argument of internal '
-                             'getrf|getri' % -info)
+    if check_finite:
+        a = np.asarray_chkfinite(a)
+    if M <= 3:
+        a[...] = _small_inv(a)
+    else:
+        a[...] = np.linalg.inv(a)
     return a
 
 
-def multiple_mahalanobis(effect, covariance):
+def _small_inv(a):
+    """ Closed-form inverses of a stack of 1x1, 2x2 or 3x3 matrices
+
+    Parameters
+    ----------
+    a : array of shape (n_samples, M, M), with ``M <= 3``
+
+    Returns
+    -------
+    inv : array of shape (n_samples, M, M)
+        The inverses (adjugate over determinant) of ``a[0], a[1], ...``.
+
+    Raises
+    ------
+    LinAlgError
+        If any of the matrices is singular.
+    """
+    M = a.shape[1]
+    adj = np.empty(a.shape, np.result_type(a, np.float64))
+    if M == 1:
+        det = a[:, 0, 0]
+        adj.fill(1)
+    elif M == 2:
+        det = a[:, 0, 0] * a[:, 1, 1] - a[:, 0, 1] * a[:, 1, 0]
+        adj[:, 0, 0] = a[:, 1, 1]
+        adj[:, 1, 1] = a[:, 0, 0]
+        np.negative(a[:, 0, 1], out=adj[:, 0, 1])
+        np.negative(a[:, 1, 0], out=adj[:, 1, 0])
+    else:
+        # the cofactor of a[i, j] goes to adj[j, i]; cyclic indices take
+        # care of the signs
+        for i in range(3):
+            i1, i2 = (i + 1) % 3, (i + 2) % 3
+            for j in range(3):
+                j1, j2 = (j + 1) % 3, (j + 2) % 3
+                np.subtract(a[:, i1, j1] * a[:, i2, j2],
+                            a[:, i1, j2] * a[:, i2, j1], out=adj[:, j, i])
+        det = np.einsum('si,si->s', a[:, 0], adj[:, :, 0])
+    if np.any(det == 0):
+        raise np.linalg.LinAlgError('singular matrix')
+    adj /= det[:, None, None]
+    return adj
+
+
+def multiple_mahalanobis(effect, covariance, check_finite=True):
     """Returns the squared Mahalanobis distance for a given set of samples
     
     Parameters
@@ -95,6 +120,10 @@ def multiple_mahalanobis(effect, covariance):
             Each column represents a vector to be evaluated
     covariance: array of shape (n_features, n_features, n_samples),
                 Corresponding covariance models stacked along the last axis
+    check_finite : bool, optional
+        Whether to check that `covariance` contains only finite numbers.
+        Disabling the check saves a pass over `covariance`; non-finite
+        covariances then give non-finite distances.
 
     Returns
     -------
@@ -111,17 +140,67 @@ def multiple_mahalanobis(effect, covariance):
     if covariance.shape[0] != covariance.shape[1]:
         raise ValueError('Inconsistant shape for covariance')
 
-    # transpose and make contuguous for the sake of speed
-    Xt, Kt = np.ascontiguousarray(effect.T), np.ascontiguousarray(covariance.T)
+    # transpose; the covariances are inverted out of place, and the other
+    # computations handle strided arrays, so there is no need to copy
+    Xt, Kt = effect.T, covariance.T
+    if check_finite:
+        Kt = np.asarray_chkfinite(Kt)
+
+    # few features: closed-form inverses are much cheaper than LAPACK calls
+    if Kt.shape[1] <= 3:
+        return _small_mahalanobis(Xt, Kt)
 
     # compute the inverse of the covariances
-    Kt = multiple_fast_inv(Kt)
-    
-    # derive the squared Mahalanobis distances
-    sqd = np.sum(np.sum(Xt[:, :, np.newaxis] * Xt[:, np.newaxis] * Kt, 1), 1)
+    Kt = np.linalg.inv(Kt)
+
+    # derive the squared Mahalanobis distances, without building the
+    # (n_samples, n_features, n_features) product array
+    sqd = np.einsum('si,sij,sj->s', Xt, Kt, Xt, optimize='greedy')
     return sqd
 
 
+def _small_mahalanobis(Xt, Kt):
+    """ Squared Mahalanobis distances for 1, 2 or 3 features
+
+    Uses the closed-form inverse (adjugate over determinant) of each
+    covariance, vectorized over samples.
+
+    Parameters
+    ----------
+    Xt : array of shape (n_samples, n_features)
+    Kt : array of shape (n_samples, n_features, n_features)
+
+    Returns
+    -------
+    sqd : array of shape (n_samples,)
+
+    Raises
+    ------
+    LinAlgError
+        If any of the covariances is singular.
+    """
+    n_features = Xt.shape[1]
+    if n_features == 1:
+        det = Kt[:, 0, 0]
+        quad = Xt[:, 0] ** 2
+    elif n_features == 2:
+        det = Kt[:, 0, 0] * Kt[:, 1, 1] - Kt[:, 0, 1] * Kt[:, 1, 0]
+        x, y = Xt[:, 0], Xt[:, 1]
+        quad = (Kt[:, 1, 1] * x * x - (Kt[:, 0, 1] + Kt[:, 1, 0]) * x * y +
+                Kt[:, 0, 0] * y * y)
+    else:
+        # rows of the cofactor matrix are cross products of rows of Kt
+        r0, r1, r2 = Kt[:, 0], Kt[:, 1], Kt[:, 2]
+        c0 = np.cross(r1, r2)
+        det = np.einsum('si,si->s', r0, c0)
+        quad = (Xt[:, 0] * np.einsum('si,si->s', c0, Xt) +
+                Xt[:, 1] * np.einsum('si,si->s', np.cross(r2, r0), Xt) +
+                Xt[:, 2] * np.einsum('si,si->s', np.cross(r0, r1), Xt))
+    if np.any(det == 0):
+        raise np.linalg.LinAlgError("singular matrix")
+    return quad / det
+
+
 def complex(maximal=[(0, 3, 2, 7),
                      (0, 6, 2, 7),
                      (0, 7, 5, 4),
@@ -141,24 +220,38 @@ def complex(maximal=[(0, 3, 2, 7),
     Returns
     -------
     faces : dict
+       Dictionary with keys ``k = 1 .. max(len(s) for s in maximal)`` and
+       values the sets of faces with ``k`` vertices, each face being a sorted
+       tuple of vertices (vertices themselves are 1-tuples).
     """
-    faces = {}
-
-    l = [len(list(x)) for x in maximal]
-    for i in range(np.max(l)):
-        faces[i+1] = set([])
-
+    maximal = [tuple(sorted(simplex)) for simplex in maximal]
+    faces = {k: set() for k in range(1, max(len(s) for s in maximal) + 1)}
     for simplex in maximal:
-        simplex = list(simplex)
-        simplex.sort()
-        for k in range(1,len(simplex)+1):
-            for v in combinations(simplex, k):
-                if len(v) == 1:
-                    v = v[0]
-                faces[k].add(v)
+        for k in range(1, len(simplex) + 1):
+            faces[k].update(combinations(simplex, k))
     return faces
 
 
+# Corners of the unit cube in 1, 2 and 3 dimensions, first axis varying
+# fastest, and the maximal simplices of its triangulation, as indices into
+# the corners
+_CUBE_CORNERS = {d: np.array(list(product(range(2), repeat=d)))[:, ::-1]
+                 for d in (1, 2, 3)}
+_CUBE_MAXIMAL = {1: np.array([(0, 1)]),
+                 2: np.array([(0, 1, 3),
+                              (0, 2, 3)]),
+                 3: np.array([(0, 3, 2, 7),
+                              (0, 6, 2, 7),
+                              (0, 7, 5, 4),
+                              (0, 7, 5, 1),
+                              (0, 7, 4, 6),
+                              (0, 3, 1, 7)])}
+
+# Cache of `cube_with_strides_center` complexes, keyed on (center, strides)
+_CUBE_CACHE = {}
+_CUBE_CACHE_SIZE = 256
+
+
 def cube_with_strides_center(center=[0,0,0],
                              strides=[4, 2, 1]):
     """ Cube in an array of voxels with a given center and strides.
@@ -184,44 +277,35 @@ def cube_with_strides_center(center=[0,0,0],
        A dictionary with integer keys representing a simplicial
        complex. The vertices of the simplicial complex are the indices
        of the corners of the cube in a 'flattened' array with specified
-       strides.
+       strides.  The faces for each key are stored in a frozenset.
+
+    Notes
+    -----
+    The complexes depend only on `center` and `strides`, and are cached on
+    these values.
+    """
+    key = (tuple(int(c) for c in center), tuple(int(s) for s in strides))
+    try:
+        faces = _CUBE_CACHE[key]
+    except KeyError:
+        if len(_CUBE_CACHE) >= _CUBE_CACHE_SIZE:
+            _CUBE_CACHE.clear()
+        faces = _cube_with_strides_center(*key)
+        _CUBE_CACHE[key] = faces
+    return dict(faces)
+
+
+def _cube_with_strides_center(center, strides):
+    """ Compute the (uncached) complex for `cube_with_strides_center`
     """
     d = len(center)
     if not 0 < d <= 3:
         raise ValueError('dimensionality must be 0 < d <= 3')
     if len(strides) != d:
         raise ValueError('center and strides must have the same length')
-    if d == 3:
-        maximal = [(0, 3, 2, 7),
-                   (0, 6, 2, 7),
-                   (0, 7, 5, 4),
-                   (0, 7, 5, 1),
-                   (0, 7, 4, 6),
-                   (0, 3, 1, 7)]
-        vertices = []
-        for k in range(2):
-            for j in range(2):
-                for i in range(2):
-                    vertices.append((center[0]+i)*strides[0] + 
-                                    (center[1]+j)*strides[1] +
-                                    (center[2]+k)*strides[2])
-    elif d == 2:
-        maximal = [(0,1,3), (0,2,3)]
-        vertices = []
-        for j in range(2):
-            for i in range(2):
-                    vertices.append((center[0]+i)*strides[0] + 
-                                    (center[1]+j)*strides[1])
-    elif d == 1:
-        maximal = [(0,1)]
-        vertices = [center[0],center[0]+strides[0]]
-
-    mm = []
-    for m in maximal:
-        nm = [vertices[j] for j in m]
-        mm.append(nm)
-    maximal = [tuple([vertices[j] for j in m]) for m in maximal]
-    return complex(maximal)
+    vertices = np.dot(_CUBE_CORNERS[d] + center, strides)
+    maximal = vertices[_CUBE_MAXIMAL[d]].tolist()
+    return {k: frozenset(v) for k, v in complex(maximal).items()}
 
 
 def join_complexes(*complexes):
@@ -229,16 +313,111 @@ def join_complexes(*complexes):
     
     Returns the union of all the particular faces.
     """
-    faces = {}
-
-    nmax = np.array([len(c) for c in complexes]).max()
-    for i in range(nmax):
-        faces[i+1] = set([])
-    for c in complexes:
-        for i in range(nmax):
-            if i+1 in c:
-                faces[i+1] = faces[i+1].union(c[i+1])
-    return faces
+    nmax = max(len(c) for c in complexes)
+    return {k: set().union(*[c[k] for c in complexes if k in c])
+            for k in range(1, nmax + 1)}
+
+
+def _cube_origins(shape, strides):
+    """ Flat indices of the origins of all cubes in an array of `shape`
+
+    Parameters
+    ----------
+    shape : sequence of int
+        Shape of the array of voxels.
+    strides : sequence of int
+        Strides (in elements) of the flattened array.
+
+    Returns
+    -------
+    origins : 1D array of int
+        Index of the first corner of each of the ``prod(shape - 1)`` cubes in
+        the array, in C order.
+    """
+    origins = np.zeros((), dtype=np.intp)
+    for n, stride in zip(shape, strides):
+        origins = np.add.outer(origins,
+                               np.arange(n - 1, dtype=np.intp) * stride)
+    return origins.reshape(-1)
+
+
+def _simplex_array(simplices, dim):
+    """ Sorted `simplices` as a ``(len(simplices), dim)`` array of int
+    """
+    return np.array(sorted(simplices), dtype=np.intp).reshape(
+        (len(simplices), dim))
+
+
+def _translated_simplices(simplices, dim, shape, strides):
+    """ Yield `simplices` translated to the origin of each cube of the array
+
+    The translation is vectorized along the last axis, so that only one row
+    of simplices is held in memory at a time.
+
+    Parameters
+    ----------
+    simplices : set of tuples
+        Simplices (with `dim` vertices each) associated to the cube at the
+        origin.
+    dim : int
+        Number of vertices per simplex.
+    shape : sequence of int
+        Shape of the array of voxels.
+    strides : sequence of int
+        Strides (in elements) of the flattened array.
+
+    Yields
+    ------
+    row : list of lists of int
+        Vertices of the translated simplices for one row of cubes along the
+        last axis.  Rows come in C order; within a row, simplices are ordered
+        by cube, then in sorted order of `simplices`.
+    """
+    row = (_cube_origins(shape[-1:], strides[-1:])[:, None, None] +
+           _simplex_array(simplices, dim)).reshape((-1, dim))
+    for origin in _cube_origins(shape[:-1], strides[:-1]).tolist():
+        yield (row + origin).tolist()
+
+
+def _decompose_lists(parts, shape, dim):
+    """ Iterate over the simplices in `parts` as lists of vertices
+
+    `parts` yields ``(simplices, shape, strides)`` for each part of the
+    triangulation, as for ``_decompose3d_parts``.
+    """
+    if dim == 1:
+        return iter(range(reduce(mul, shape, 1)))
+    return chain.from_iterable(
+        row for simplices, _shape, _strides in parts
+        for row in _translated_simplices(simplices, dim, _shape, _strides))
+
+
+def _decompose_array(parts, shape, dim):
+    """ Array of the simplices in `parts`, one row per simplex
+
+    `parts` yields ``(simplices, shape, strides)`` for each part of the
+    triangulation, as for ``_decompose3d_parts``.
+    """
+    if dim == 1:
+        return np.arange(reduce(mul, shape, 1), dtype=np.intp)[:, None]
+    blocks = [(_cube_origins(_shape, _strides)[:, None, None] +
+               _simplex_array(simplices, dim)).reshape((-1, dim))
+              for simplices, _shape, _strides in parts]
+    if not blocks:
+        return np.zeros((0, dim), dtype=np.intp)
+    return np.concatenate(blocks)
+
+
+def _count_simplices(parts, shape, dim):
+    """ Number of simplices in `parts`, without listing them
+
+    `parts` yields ``(simplices, shape, strides)`` for each part of the
+    triangulation, as for ``_decompose3d_parts``.
+    """
+    if dim == 1:
+        return reduce(mul, shape, 1)
+    return sum(len(simplices) * reduce(mul, [n - 1 for n in _shape], 1)
+               for simplices, _shape, _strides in parts)
 
 
 def decompose3d(shape, dim=4):
@@ -247,13 +426,48 @@ def decompose3d(shape, dim=4):
     of a cube of a given shape. The vertices in the triangulation
     are indices in a 'flattened' array of the specified shape.
     """
+    return _decompose_lists(_decompose3d_parts(shape, dim), shape, dim)
+
+
+def decompose3d_array(shape, dim=4):
+    """ Array of the simplices of ``decompose3d(shape, dim)``
+
+    Parameters
+    ----------
+    shape : sequence of 3 int
+        Shape of the array of voxels.
+    dim : int, optional
+        Number of vertices per simplex.
+
+    Returns
+    -------
+    simplices : (N, dim) array of int
+        One row per simplex, in the order of ``decompose3d(shape, dim)``,
+        with vertices as indices in the flattened array.
+    """
+    return _decompose_array(_decompose3d_parts(shape, dim), shape, dim)
+
+
+def _decompose3d_parts(shape, dim):
+    """ Yield the parts of the triangulation in `decompose3d`
+
+    Yields
+    ------
+    simplices : set of tuples
+        Simplices with `dim` vertices uniquely associated with the first cube
+        of the part.
+    shape : tuple of int
+        Shape of the part: the interior, a two-dimensional face or an edge.
+    strides : tuple of int
+        Strides (in elements) of the part.
+    """
 
     # First do the interior contributions.
     # We first figure out which vertices, edges, triangles, tetrahedra
     # are uniquely associated with an interior voxel
 
     unique = {}
-    strides = np.empty(shape, np.bool_).strides
+    strides = strides_from(shape, np.bool_)
     union = join_complexes(*[cube_with_strides_center((0,0,-1), strides),
                              cube_with_strides_center((0,-1,0), strides),
                              cube_with_strides_center((0,-1,-1), strides),
@@ -267,14 +481,7 @@ def decompose3d(shape, dim=4):
         unique[i+1] = c[i+1].difference(union[i+1])
 
     if dim in unique and dim > 1:
-        d = unique[dim]
-
-        for i in range(shape[0]-1):
-            for j in range(shape[1]-1):
-                for k in range(shape[2]-1):
-                    index = i*strides[0]+j*strides[1]+k*strides[2]
-                    for l in d:
-                        yield [index+ii for ii in l]
+        yield unique[dim], tuple(shape), strides
 
     # There are now contributions from three two-dimensional faces
 
@@ -295,13 +502,7 @@ def decompose3d(shape, dim=4):
             unique[i+1] = c[i+1].difference(union[i+1])
         
         if dim in unique and dim > 1:
-            d = unique[dim]
-
-            for i in range(_shape[0]-1):
-                for j in range(_shape[1]-1):
-                        index = i*_strides[0]+j*_strides[1]
-                        for l in d:
-                            yield [index+ii for ii in l]
+            yield unique[dim], _shape, _strides
 
     # Finally the one-dimensional faces
 
@@ -314,16 +515,7 @@ def decompose3d(shape, dim=4):
             unique[i+1] = c[i+1].difference(union[i+1])
 
         if dim in unique and dim > 1:
-            d = unique[dim]
-
-            for i in range(_shape-1):
-                index = i*_stride
-                for l in d:
-                    yield [index+ii for ii in l]
-
-    if dim == 1:
-        for i in range(np.product(shape)):
-            yield i
+            yield unique[dim], (_shape,), (_stride,)
 
 
 def decompose2d(shape, dim=3):
@@ -332,12 +524,39 @@ def decompose2d(shape, dim=3):
     of a square of a given shape. The vertices in the triangulation
     are indices in a 'flattened' array of the specified shape.
     """
+    return _decompose_lists(_decompose2d_parts(shape, dim), shape, dim)
+
+
+def decompose2d_array(shape, dim=3):
+    """ Array of the simplices of ``decompose2d(shape, dim)``
+
+    Parameters
+    ----------
+    shape : sequence of 2 int
+        Shape of the array of pixels.
+    dim : int, optional
+        Number of vertices per simplex.
+
+    Returns
+    -------
+    simplices : (N, dim) array of int
+        One row per simplex, in the order of ``decompose2d(shape, dim)``,
+        with vertices as indices in the flattened array.
+    """
+    return _decompose_array(_decompose2d_parts(shape, dim), shape, dim)
+
+
+def _decompose2d_parts(shape, dim):
+    """ Yield the parts of the triangulation in `decompose2d`
+
+    As for ``_decompose3d_parts``, with the interior and the edges.
+    """
     # First do the interior contributions.
     # We first figure out which vertices, edges, triangles
     # are uniquely associated with an interior pixel
 
     unique = {}
-    strides = np.empty(shape, np.bool_).strides
+    strides = strides_from(shape, np.bool_)
     union = join_complexes(*[cube_with_strides_center((0,-1), strides),
                              cube_with_strides_center((-1,0), strides),
                              cube_with_strides_center((-1,-1), strides)])
@@ -346,13 +565,7 @@ def decompose2d(shape, dim=3):
         unique[i+1] = c[i+1].difference(union[i+1])
 
     if dim in unique and dim > 1:
-        d = unique[dim]
-
-        for i in range(shape[0]-1):
-            for j in range(shape[1]-1):
-                    index = i*strides[0]+j*strides[1]
-                    for l in d:
-                        yield [index+ii for ii in l]
+        yield unique[dim], tuple(shape), strides
 
     # Now, the one-dimensional faces
 
@@ -365,34 +578,15 @@ def decompose2d(shape, dim=3):
             unique[i+1] = c[i+1].difference(union[i+1])
 
         if dim in unique and dim > 1:
-            d = unique[dim]
-
-            for i in range(_shape-1):
-                index = i*_stride
-                for l in d:
-                    yield [index+ii for ii in l]
-
-    if dim == 1:
-        for i in range(np.product(shape)):
-            yield i
+            yield unique[dim], (_shape,), (_stride,)
 
 
 def test_EC3(shape):
 
-    ts = 0
-    fs = 0
-    es = 0
-    vs = 0
-    ec = 0
-
-    for t in decompose3d(shape, dim=4):
-        ec -= 1; ts += 1
-    for f in decompose3d(shape, dim=3):
-        ec += 1; fs += 1
-    for e in decompose3d(shape, dim=2):
-        ec -= 1; es += 1
-    for v in decompose3d(shape, dim=1):
-        ec += 1; vs += 1
+    ts, fs, es, vs = [_count_simplices(_decompose3d_parts(shape, dim),
+                                       shape, dim)
+                      for dim in (4, 3, 2, 1)]
+    ec = vs - es + fs - ts
     return ts, fs, es, vs, ec
 
 # Tell nose testing framework not to run this as a test
@@ -401,17 +595,9 @@ test_EC3.__test__ = False
 
 def test_EC2(shape):
 
-    fs = 0
-    es = 0
-    vs = 0
-    ec = 0
-
-    for f in decompose2d(shape, dim=3):
-        ec += 1; fs += 1
-    for e in decompose2d(shape, dim=2):
-        ec -= 1; es += 1
-    for v in decompose2d(shape, dim=1):
-        ec += 1; vs += 1
+    fs, es, vs = [_count_simplices(_decompose2d_parts(shape, dim), shape, dim)
+                  for dim in (3, 2, 1)]
+    ec = vs - es + fs
     return fs, es, vs, ec
 
 # Tell nose testing framework not to run this as a test
@@ -429,7 +615,8 @@ def check_cast_bin8(arr):
     -------
     bin8_arr : uint8 array
         `bin8_arr` has same shape as `arr`, is of dtype ``np.uint8``, with
-        values 0 and 1 only.
+        values 0 and 1 only.  If `arr` is of dtype ``np.bool_`` or
+        ``np.uint8``, `bin8_arr` shares memory with `arr`.
 
     Raises
     ------
@@ -437,6 +624,11 @@ def check_cast_bin8(arr):
         When the array is not binary.  Speficically, raise if, for any element
         ``e``, ``e != (e != 0)``.
     """
-    if np.any(arr != (arr !=0)):
+    arr = np.asarray(arr)
+    if arr.dtype == np.bool_:
+        return arr.view(np.uint8)
+    not_binary = arr != 0
+    not_binary &= arr != 1
+    if not_binary.any():
         raise ValueError('input array should only contain values 0 and 1')
-    return arr.astype(np.uint8)
+    return arr.astype(np.uint8, copy=False)
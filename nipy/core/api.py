@@ -24,6 +24,6 @@ from .image.image_spaces import (xyz_affine, is_xyz_affable, as_xyz_image,
 
 from .image.image_list import ImageList
 
-from .utils.generators import (parcels, data_generator, write_data,
-                               slice_generator, f_generator,
+from .utils.generators import (parcels, parcels_indices, data_generator,
+                               write_data, slice_generator, f_generator,
                                matrix_generator)
@@ -15,10 +15,13 @@ The above three generators return 2-tuples.
 
 * write_data: write the output of a generator to an ndarray
 * parcels: return binary array of the unique components of data
+* parcels_indices: return flat indices of the unique components of data
 """
 from __future__ import print_function
 from __future__ import absolute_import
 
+from itertools import product
+
 import numpy as np
 
 from nipy.utils import seq_prod
@@ -26,6 +29,12 @@ from nipy.utils import seq_prod
 # Legacy repr printing from numpy.
 from nipy.testing import legacy_printing as setup_module  # noqa
 
+# Slice over a whole axis
+_FULL = slice(None)
+
+# Maximum number of mask elements compared at once in `slice_parcels`
+_MASK_BLOCK_SIZE = 2 ** 20
+
 
 def parcels(data, labels=None, exclude=()):
     """ Return a generator for ``[data == label for label in labels]``
@@ -85,16 +94,62 @@ def parcels(data, labels=None, exclude=()):
         data = np.asarray(data)
     if labels is None:
         labels = np.unique(data)
+    try:
+        exclude = set(exclude)
+    except TypeError: # unhashable values; keep the sequence
+        pass
     for label in labels:
-        if label in exclude:
+        try:
+            excluded = label in exclude
+        except TypeError: # list label, which cannot be in a set
+            excluded = False
+        if excluded:
             continue
-        if type(label) not in [type(()), type([])]:
+        if not isinstance(label, (tuple, list)):
             yield np.equal(data, label)
         else:
-            v = 0
-            for l in label:
-                v += np.equal(data, l)
-            yield v.astype(bool)
+            yield np.isin(data, label)
+
+
+def parcels_indices(data, labels=None, exclude=()):
+    """ Return a generator for ``[np.flatnonzero(p) for p in parcels(data)]``
+
+    Parameters are as for `parcels`.  The flat indices take less memory than
+    boolean masks when the parcels are small, and select the values of each
+    parcel with ``np.take(data, indices)``.
+
+    Parameters
+    ----------
+    data : image or array-like
+        Either an image (with ``get_fdata`` method returning ndarray) or an
+        array-like
+    labels : iterable, optional
+        A sequence of labels for which to return indices within `data`, as
+        for `parcels`.
+    exclude : iterable, optional
+        Values in `labels` for which you do not want to return a parcel.
+
+    Returns
+    -------
+    gen : generator
+        generator yielding an array of indices into the flattened `data` for
+        which ``data == label``, for each element in `labels`.
+
+    Examples
+    --------
+    >>> for p in parcels_indices([[1,1],[2,1]]):
+    ...     print(p)
+    ...
+    [0 1 3]
+    [2]
+    >>> for p in parcels_indices([[1,1],[2,3]], labels=[(2,3),2]):
+    ...     print(p)
+    ...
+    [2 3]
+    [2]
+    """
+    for p in parcels(data, labels=labels, exclude=exclude):
+        yield np.flatnonzero(p)
 
 
 def data_generator(data, iterable=None):
@@ -142,7 +197,7 @@ def write_data(output, iterable):
         output[index] = data
 
 
-def slice_generator(data, axis=0):
+def slice_generator(data, axis=0, memory_order=False):
     """ Return generator for yielding slices along `axis`
 
     Parameters
@@ -150,7 +205,13 @@ def slice_generator(data, axis=0):
     data : array-like
     axis : int or list or tuple
         If int, gives the axis.  If list or tuple, gives the combination of
-        axes over which to iterate.  First axis is fastest changing in output.
+        axes over which to iterate.  First axis is fastest changing in output,
+        unless `memory_order` is True.
+    memory_order : bool, optional
+        If True, and `axis` is a list or tuple, iterate so that the axis with
+        the smallest stride in `data` is fastest changing in output.  The
+        slices then come in the order they are laid out in memory, which is
+        faster for reading or writing all the slices of a large array.
 
     Examples
     --------
@@ -164,31 +225,39 @@ def slice_generator(data, axis=0):
     ...
     (slice(None, None, None), 0) [1 3]
     (slice(None, None, None), 1) [2 4]
+    >>> for i,d in slice_generator([[1,2],[3,4]], axis=(0, 1), memory_order=True):
+    ...     print(i, d)
+    ...
+    (0, 0) 1
+    (0, 1) 2
+    (1, 0) 3
+    (1, 1) 4
     """
     data = np.asarray(data)
-    if type(axis) is type(1):
+    if isinstance(axis, (int, np.integer)):
+        if axis == 0:
+            for j in range(data.shape[0]):
+                yield (j,), data[j]
+            return
+        lead = (_FULL,) * axis
         for j in range(data.shape[axis]):
-            ij = (slice(None,None,None),)*axis + (j,)
-            yield ij, data[(slice(None,None,None),)*axis + (j,)]
+            ij = lead + (j,)
+            yield ij, data[ij]
         return
 
-    # the total number of iterations to be made
-    axis_lens = [data.shape[a] for a in axis]
-    nmax = seq_prod(axis_lens)
-
-    # calculate the 'divmod' parameter which is used to work out
-    # which index to use to use for each axis during iteration
-    mods = np.cumprod(axis_lens)
-    divs = [1] + list(mods[:-1])
-
     # set up a full set of slices for the image, to be modified
     # at each iteration
     slice_template = [slice(0, s) for s in data.shape]
 
-    for n in range(nmax):
+    # product varies its last argument fastest, so feed it the axes in
+    # reverse order
+    if memory_order:
+        axis = sorted(axis, key=lambda a: -abs(data.strides[a]))
+    else:
+        axis = list(axis)[::-1]
+    for idx in product(*[range(data.shape[a]) for a in axis]):
         slices = slice_template[:]
-        for (a, div, mod) in zip(axis, divs, mods):
-            x = int(n / div % mod)
+        for a, x in zip(axis, idx):
             slices[a] = x
         slices = tuple(slices)
         yield slices, data[slices]
@@ -238,19 +307,33 @@ def slice_parcels(data, labels=None, axis=0):
     ((slice(None, None, None), 2), array([ True,  True,  True], dtype=bool)) [0 0 0]
     ((slice(None, None, None), 3), array([ True,  True,  True], dtype=bool)) [1 1 1]
     """
+    if labels is not None:
+        labels = list(labels)
+        if not any(isinstance(label, (tuple, list)) for label in labels):
+            labels = np.asarray(labels)
     for i, d in slice_generator(data, axis=axis):
-        for p in parcels(d, labels=labels):
-            yield (i, p)
+        if isinstance(labels, list):  # some labels are unions of values
+            for p in parcels(d, labels=labels):
+                yield (i, p)
+            continue
+        slice_labels = np.unique(d) if labels is None else labels
+        # Masks for blocks of labels of the slice in one comparison; the
+        # blocks are bounded, as each yielded mask keeps its block alive
+        step = max(1, _MASK_BLOCK_SIZE // max(d.size, 1))
+        for start in range(0, len(slice_labels), step):
+            for p in np.equal.outer(slice_labels[start:start + step], d):
+                yield (i, p)
 
 
 def matrix_generator(img):
     """
     From a generator of items (i, r), return
     (i, rp) where rp is a 2d array with rp.shape = (r.shape[0], prod(r.shape[1:]))
+
+    `rp` is a view of `r` where possible; `r` itself is not reshaped.
     """
     for i, r in img:
-        r.shape = (r.shape[0], np.product(r.shape[1:]))
-        yield i, r
+        yield i, r.reshape((r.shape[0], seq_prod(r.shape[1:])))
 
 
 def shape_generator(img, shape):
@@ -259,5 +342,4 @@ def shape_generator(img, shape):
     (i, r.reshape(shape))
     """
     for i, r in img:
-        r.shape = shape
-        yield i, r
+        yield i, r.reshape(shape)
@@ -23,6 +23,9 @@ def test_read_slices():
         assert_equal(d.shape, (10, 30))
     for _, d in slice_generator(DATA, axis=2):
         assert_equal(d.shape, (10, 20))
+    # numpy integer axis
+    for _, d in slice_generator(DATA, axis=np.int64(2)):
+        assert_equal(d.shape, (10, 20))
 
 
 def test_write_slices():
@@ -54,6 +57,26 @@ def test_multi_slice():
     assert_equal(slice_defs[1][0], (slice(0, 10, None), 0, 1))
     assert_equal(slice_defs[598][0], (slice(0, 10, None), 19, 28))
     assert_equal(slice_defs[599][0], (slice(0, 10, None), 19, 29))
+    # More than two axes, first axis fastest changing
+    data = np.arange(120).reshape((2, 3, 4, 5))
+    slice_defs = list(slice_generator(data, axis=[0, 1, 2]))
+    assert_equal(len(slice_defs), 24)
+    for k, (slices, d) in enumerate(slice_defs):
+        assert_equal(slices, (k % 2, k // 2 % 3, k // 6, slice(0, 5, None)))
+        assert_array_equal(d, data[k % 2, k // 2 % 3, k // 6])
+    # Slices in memory order, smallest stride fastest changing
+    slice_defs = list(slice_generator(data, axis=[0, 1, 2],
+                                      memory_order=True))
+    for k, (slices, d) in enumerate(slice_defs):
+        assert_equal(slices, (k // 12, k // 4 % 3, k % 4, slice(0, 5, None)))
+        assert_array_equal(d, data[slices])
+    data_t = data.transpose()
+    slice_defs = list(slice_generator(data_t, axis=[1, 3],
+                                      memory_order=True))
+    for k, (slices, d) in enumerate(slice_defs):
+        assert_equal(slices, (slice(0, 5, None), k % 4, slice(0, 3, None),
+                              k // 4))
+        assert_array_equal(d, data_t[slices])
 
 
 def test_multi_slice_write():
@@ -83,6 +106,43 @@ def test_parcel():
         assert_equal((expected[i],), d.shape)
 
 
+def test_parcel_union():
+    # Sequence labels give the union of their values
+    data = np.array([[0, 1, 2], [3, 4, 1]])
+    ps = gen.parcels(data, [(1, 3), [4], 2, (5,)])
+    assert_array_equal(next(ps), [[False, True, False], [True, False, True]])
+    assert_array_equal(next(ps), [[False, False, False], [False, True, False]])
+    assert_array_equal(next(ps), [[False, False, True], [False, False, False]])
+    assert_array_equal(next(ps), np.zeros((2, 3), dtype=bool))
+    assert_raises(StopIteration, next, ps)
+
+
+def test_slice_parcels():
+    data = np.array([[0, 0, 0, 1], [0, 1, 0, 1], [2, 2, 0, 1]])
+    # Also compare labels in blocks smaller than the number of labels
+    old_block_size = gen._MASK_BLOCK_SIZE
+    try:
+        gen._MASK_BLOCK_SIZE = 8
+        _check_slice_parcels(data)
+    finally:
+        gen._MASK_BLOCK_SIZE = old_block_size
+    _check_slice_parcels(data)
+
+
+def _check_slice_parcels(data):
+    for labels in (None, [0, 1, 2], [(0, 1), 2]):
+        expected = [(i, p) for i, d in slice_generator(data)
+                    for p in gen.parcels(d, labels=labels)]
+        # labels can be any iterable
+        if labels is not None:
+            labels = iter(labels)
+        got = list(gen.slice_parcels(data, labels=labels))
+        assert_equal(len(got), len(expected))
+        for (i, p), (ei, ep) in zip(got, expected):
+            assert_equal(i, ei)
+            assert_array_equal(p, ep)
+
+
 def test_parcel_exclude():
     # Test excluding from parcels
     data = np.arange(5)
@@ -106,6 +166,14 @@ def test_parcel_exclude():
     ps = gen.parcels(data, (1, 3, 4), exclude=np.array((1, 4)))
     assert_array_equal(next(ps), [False, False, False, True, False])
     assert_raises(StopIteration, next, ps)
+    # Sequence labels and excludes
+    ps = gen.parcels(data, [(1, 3), [0, 4], 2], exclude=[(1, 3)])
+    assert_array_equal(next(ps), [True, False, False, False, True])
+    assert_array_equal(next(ps), [False, False, True, False, False])
+    assert_raises(StopIteration, next, ps)
+    ps = gen.parcels(data, [(1, 3), [0, 4], 2], exclude=[[0, 4], 2])
+    assert_array_equal(next(ps), [False, True, False, True, False])
+    assert_raises(StopIteration, next, ps)
     # Test that parcels continue to be returned in sorted order
     rng = np.random.RandomState(42)
     data = rng.normal(size=(10,))
@@ -115,6 +183,18 @@ def test_parcel_exclude():
     assert_array_equal(values, uni[2:])
 
 
+def test_parcels_indices():
+    rng = np.random.RandomState(42)
+    data = rng.randint(0, 4, size=(3, 4, 5))
+    for labels, exclude in ((None, ()), ([(0, 1), 3], ()), (None, (2,))):
+        ps = list(gen.parcels(data, labels, exclude))
+        pis = list(gen.parcels_indices(data, labels, exclude))
+        assert_equal(len(pis), len(ps))
+        for p, pi in zip(ps, pis):
+            assert_array_equal(pi, np.flatnonzero(p))
+            assert_array_equal(np.take(data, pi), data[p])
+
+
 def test_parcel_write():
     parcelmap = np.zeros(DATA3.shape)
     parcelmap[0,0,0] = 1
@@ -174,3 +254,17 @@ def test_sliceparcel():
                        np.array([[1,1,1,0,2],
                                  [4,4,3,3,5],
                                  [7,7,7,7,8]]))
+
+
+def test_matrix_shape_generators():
+    data = np.arange(24).reshape((2, 3, 4))
+    # Non-contiguous input, which cannot be reshaped in place
+    data_t = data.transpose((0, 2, 1))
+    for i, r in gen.matrix_generator(gen.data_generator(data_t)):
+        assert_array_equal(r, data_t[i].reshape((4, 3)))
+    assert_equal(data_t.shape, (2, 4, 3))
+    ro = data.copy()
+    ro.flags.writeable = False
+    for i, r in gen.shape_generator(gen.data_generator(ro), (12,)):
+        assert_array_equal(r, np.arange(12) + 12 * i)
+    assert_equal(ro.shape, (2, 3, 4))
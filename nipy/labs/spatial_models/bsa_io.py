@@ -6,6 +6,8 @@ It handles the images provided as input and produces result images.
 """
 from __future__ import absolute_import
 
+from multiprocessing.pool import ThreadPool
+
 from six import string_types
 
 import numpy as np
@@ -17,6 +19,23 @@ from .bayesian_structural_analysis import compute_landmarks
 from .discrete_domain import domain_from_image
 from ...io.nibcompat import get_header, get_affine
 
+# Maximum number of threads reading the subject images
+MAX_READ_THREADS = 8
+
+
+def _bounding_box(mask):
+    """ Slices for the smallest box holding the nonzero voxels of `mask`
+    """
+    box = []
+    for axis in range(mask.ndim):
+        others = tuple(a for a in range(mask.ndim) if a != axis)
+        nonzero = np.flatnonzero(np.any(mask, axis=others))
+        if nonzero.size == 0:
+            return (slice(0, 0),) * mask.ndim
+        box.append(slice(nonzero[0], nonzero[-1] + 1))
+    return tuple(box)
+
+
 def make_bsa_image(
     mask_images, stat_images, threshold=3., smin=0, sigma=5.,
     prevalence_threshold=0, prevalence_pval=0.5, write_dir=None,
@@ -79,12 +98,37 @@ def make_bsa_image(
     domain = domain_from_image(Nifti1Image(mask, affine), nn=18)
     n_voxels = domain.size
 
-    # read the functional images
-    stats = []
-    for stat_image in stat_images:
-        beta = np.reshape(load(stat_image).get_fdata(), ref_dim)
-        stats.append(beta[mask > 0])
-    stats = np.array(stats).T
+    # read the functional images, gathering the in-mask voxels of each
+    # subject straight into its column of stats.  Columns are contiguous, as
+    # they are written here and read one subject at a time by
+    # compute_landmarks.  Only the bounding box of the mask is read from
+    # each image.
+    mask_pos = mask > 0
+    flat_idx = np.flatnonzero(mask_pos)
+    box = _bounding_box(mask_pos)
+    box_mask = mask_pos[box]
+    box_idx = np.flatnonzero(box_mask)
+    if flat_idx.size != n_voxels:
+        raise ValueError('mask and domain disagree on the number of voxels')
+    stats = np.empty((flat_idx.size, n_subjects), order='F')
+
+    def read_stats(subject):
+        stat_image = stat_images[subject]
+        rbeta = load(stat_image)
+        if rbeta.shape[:3] != ref_dim:
+            raise ValueError('stat image %s does not have shape %s'
+                             % (stat_image, ref_dim))
+        beta = np.reshape(np.asarray(rbeta.dataobj[box]), box_mask.shape)
+        stats[:, subject] = np.take(beta, box_idx)
+
+    # The reads are mostly file access and decompression, which release the
+    # GIL, so threads read the subjects in parallel
+    pool = ThreadPool(min(MAX_READ_THREADS, n_subjects))
+    try:
+        pool.map(read_stats, range(n_subjects))
+    finally:
+        pool.close()
+        pool.join()
 
     # launch the method
     crmap = - np.ones(n_voxels).astype(np.int16)
@@ -112,7 +156,7 @@ def make_bsa_image(
 
     # the spatial density image
     density_map = np.zeros(ref_dim)
-    density_map[mask > 0] = density
+    density_map.ravel()[flat_idx] = density
     wim = Nifti1Image(density_map, affine)
     get_header(wim)['descrip'] = ('group-level spatial density '
                                   'of active regions')
@@ -121,16 +165,17 @@ def make_bsa_image(
 
     # write a 3D image for group-level labels
     labels = - 2 * np.ones(ref_dim)
-    labels[mask > 0] = crmap
+    labels.ravel()[flat_idx] = crmap
     wim = Nifti1Image(labels.astype('int16'), affine)
     get_header(wim)['descrip'] = 'group Level labels from bsa procedure'
     save(wim, op.join(write_dir, "CR_%s.nii" % contrast_id))
 
     # write a prevalence image
     prev_ = np.zeros(crmap.size).astype(np.float64)
-    prev_[crmap > -1] = prevalence[crmap[crmap > -1]]
+    labelled = crmap > -1
+    prev_[labelled] = prevalence[crmap[labelled]]
     prevalence_map = - np.ones(ref_dim)
-    prevalence_map[mask > 0] = prev_
+    prevalence_map.ravel()[flat_idx] = prev_
     wim = Nifti1Image(prevalence_map, affine)
     get_header(wim)['descrip'] = 'Weighted prevalence image'
     save(wim, op.join(write_dir, "prevalence_%s.nii" % contrast_id))
@@ -138,14 +183,19 @@ def make_bsa_image(
     # write a 4d images with all subjects results
     wdim = (ref_dim[0], ref_dim[1], ref_dim[2], n_subjects)
     labels = - 2 * np.ones(wdim, 'int16')
+    # view with one row per voxel, for writing the in-mask voxels
+    flat_labels = labels.reshape((-1, n_subjects))
     for subject in range(n_subjects):
-        labels[mask > 0, subject] = - 1
-        if hrois[subject].k > 0:
-            nls = hrois[subject].get_roi_feature('label')
-            nls[nls == - 1] = default_idx
-            lab = hrois[subject].label
-            lab[lab > - 1] = nls[lab[lab > - 1]]
-            labels[mask > 0, subject] = lab
+        hroi = hrois[subject]
+        if hroi is None or hroi.k == 0:
+            flat_labels[flat_idx, subject] = - 1
+            continue
+        nls = hroi.get_roi_feature('label')
+        nls[nls == - 1] = default_idx
+        lab = hroi.label
+        labelled = lab > - 1
+        lab[labelled] = nls[lab[labelled]]
+        flat_labels[flat_idx, subject] = lab
     wim = Nifti1Image(labels, affine)
     get_header(wim)['descrip'] = 'Individual labels from bsa procedure'
     save(wim, op.join(write_dir, "AR_%s.nii" % contrast_id))
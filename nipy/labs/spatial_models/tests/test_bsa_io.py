@@ -43,6 +43,26 @@ def test_parcel_intra_from_3d_images_list():
         assert_true(exists('CR_%s.nii' % contrast_id))
 
 
+def test_bsa_image_signed_mask():
+    # Only positive mask values are in the mask, as for the domain
+    shape = (12, 12, 8)
+    mask = np.ones(shape)
+    mask[:2] = -1
+    mask[-1] = np.nan
+    mask_image = Nifti1Image(mask, np.eye(4))
+    with InTemporaryDirectory() as dir_context:
+        data_image = ['image_%d.nii' % i for i in range(4)]
+        for i, datim in enumerate(data_image):
+            surrogate_3d_dataset(mask=Nifti1Image(np.ones(shape), np.eye(4)),
+                                 out_image_file=datim, seed=i)
+        landmark, hrois = make_bsa_image(
+            mask_image, data_image, threshold=2., smin=0, sigma=1.,
+            write_dir=dir_context, contrast_id='signed')
+        assert_equal(len(hrois), 4)
+        for hroi in hrois:
+            assert_equal(hroi.domain.size, 9 * 12 * 8)
+
+
 if __name__ == "__main__":
     import nose
     nose.run(argv=['', __file__])
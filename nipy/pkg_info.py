@@ -8,6 +8,10 @@ from six.moves import configparser
 
 COMMIT_INFO_FNAME = 'COMMIT_INFO.txt'
 
+# Results of `pkg_commit_hash` and `get_pkg_info`, keyed on `pkg_path`
+_COMMIT_HASHES = {}
+_PKG_INFOS = {}
+
 def pkg_commit_hash(pkg_path):
     ''' Get short form of commit hash given directory `pkg_path`
 
@@ -26,6 +30,8 @@ def pkg_commit_hash(pkg_path):
 
     If all these fail, we return a not-found placeholder tuple.
 
+    The result is cached for each `pkg_path`.
+
     Parameters
     -------------
     pkg_path : str
@@ -38,6 +44,18 @@ def pkg_commit_hash(pkg_path):
     hash_str : str
        short form of hash
     '''
+    try:
+        return _COMMIT_HASHES[pkg_path]
+    except KeyError:
+        pass
+    result = _pkg_commit_hash(pkg_path)
+    _COMMIT_HASHES[pkg_path] = result
+    return result
+
+
+def _pkg_commit_hash(pkg_path):
+    ''' Compute the (uncached) result for `pkg_commit_hash`
+    '''
     # Try and get commit from written commit text file
     pth = os.path.join(pkg_path, COMMIT_INFO_FNAME)
     if not os.path.isfile(pth):
@@ -51,11 +69,15 @@ def pkg_commit_hash(pkg_path):
     if install_subst != '':
         return 'installation', install_subst
     # maybe we are in a repository
-    proc = subprocess.Popen('git rev-parse --short HEAD',
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            cwd=pkg_path, shell=True)
-    repo_commit, _ = proc.communicate()
+    try:
+        proc = subprocess.Popen(['git', 'rev-parse', '--short', 'HEAD'],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                cwd=pkg_path)
+    except OSError: # no git executable
+        repo_commit = None
+    else:
+        repo_commit, _ = proc.communicate()
     if repo_commit:
         return 'repository', repo_commit.strip()
     return '(none found)', '<not found>'
@@ -72,12 +94,17 @@ def get_pkg_info(pkg_path):
     Returns
     ----------
     context : dict
-       with named parameters of interest
+       with named parameters of interest.  The values are cached for each
+       `pkg_path`; the returned dict is a copy.
     '''
+    try:
+        return dict(_PKG_INFOS[pkg_path])
+    except KeyError:
+        pass
     src, hsh = pkg_commit_hash(pkg_path)
     import numpy
     import nipy
-    return dict(
+    info = dict(
         pkg_path=pkg_path,
         commit_source=src,
         commit_hash=hsh,
@@ -86,3 +113,5 @@ def get_pkg_info(pkg_path):
         sys_platform=sys.platform,
         np_version=numpy.__version__,
         nipy_version=nipy.__version__)
+    _PKG_INFOS[pkg_path] = info
+    return dict(info)
@@ -0,0 +1,25 @@
+""" Tests for package information
+"""
+from __future__ import absolute_import
+
+import os
+
+import nipy
+from ..pkg_info import pkg_commit_hash
+
+from nose.tools import assert_equal, assert_false, assert_true
+
+
+def test_pkg_info():
+    info = nipy.get_info()
+    assert_equal(info['nipy_version'], nipy.__version__)
+    assert_equal(info['pkg_path'], os.path.dirname(nipy.__file__))
+    # Values are cached, but returned as a new dict each time
+    info['nipy_version'] = None
+    info2 = nipy.get_info()
+    assert_false(info2 is info)
+    assert_equal(info2['nipy_version'], nipy.__version__)
+    assert_equal((info2['commit_source'], info2['commit_hash']),
+                 pkg_commit_hash(info2['pkg_path']))
+    assert_true(pkg_commit_hash(info2['pkg_path']) is
+                pkg_commit_hash(info2['pkg_path']))